@@ -0,0 +1,70 @@
+"""Admin CLI for bulk export/import of dish libraries and sessions.
+
+Uses the same NDJSON format as GET /api/export and POST /api/import, and the
+MONGO_URL / DB_NAME settings from backend/.env.
+
+    python data_transfer.py export -o backup.ndjson             # all users
+    python data_transfer.py export --user USER_ID -o user.ndjson
+    python data_transfer.py import -i backup.ndjson              # keeps each document's userId
+    python data_transfer.py import -i user.ndjson --user NEW_USER_ID
+"""
+import argparse
+import asyncio
+import json
+import sys
+
+from server import client, ensure_indexes, export_documents, import_documents
+
+
+async def read_lines(path: str):
+    # Raw bytes, so undecodable lines are counted as invalid by import_documents
+    stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+    try:
+        for line in stream:
+            yield line
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+
+
+async def run_export(args):
+    stream = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    count = 0
+    try:
+        async for line in export_documents(args.user):
+            stream.write(line)
+            count += 1
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+    print(f"Exported {count} documents", file=sys.stderr)
+
+
+async def run_import(args):
+    # Import dedupe relies on the unique id indexes; fail before writing if they cannot be built
+    await ensure_indexes()
+    result = await import_documents(read_lines(args.input), args.user)
+    print(json.dumps(result, indent=2), file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export or import Smart Cooking Sync user data as NDJSON")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    export_parser = subparsers.add_parser('export', help="Export saved dishes, dishes and tasks")
+    export_parser.add_argument('--user', help="Only export this user's data (default: all users)")
+    export_parser.add_argument('-o', '--output', default='-', help="Output file (default: stdout)")
+
+    import_parser = subparsers.add_parser('import', help="Import an NDJSON export, skipping existing ids")
+    import_parser.add_argument('--user', help="Assign all imported documents to this user")
+    import_parser.add_argument('-i', '--input', default='-', help="Input file (default: stdin)")
+
+    args = parser.parse_args()
+    try:
+        asyncio.run(run_export(args) if args.command == 'export' else run_import(args))
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""Write .br and .gz variants next to compressible files in a React build.
+
+Run after `yarn build` so the backend (STATIC_DIR) can serve precompressed
+assets without compressing per request:
+
+    python precompress_assets.py ../frontend/build
+
+Brotli variants need the optional `Brotli` package; without it only gzip
+variants are written.
+"""
+import argparse
+import gzip
+import sys
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_SUFFIXES = {".js", ".css", ".html", ".json", ".map", ".svg", ".txt", ".ico", ".xml", ".webmanifest"}
+MIN_SIZE = 1024  # Smaller files are not worth the extra round of decoding
+
+
+def compress_file(path: Path) -> list:
+    """Write compressed variants of a file, keeping only those smaller than the original"""
+    data = path.read_bytes()
+    written = []
+    variants = [(".gz", lambda d: gzip.compress(d, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        variants.insert(0, (".br", lambda d: brotli.compress(d, quality=11)))
+
+    for suffix, compress in variants:
+        compressed = compress(data)
+        target = path.with_name(path.name + suffix)
+        if len(compressed) < len(data):
+            target.write_bytes(compressed)
+            written.append(suffix)
+        elif target.exists():
+            target.unlink()  # Stale variant from a previous build
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompress a React build for the backend static mode")
+    parser.add_argument('build_dir', help="Path to the React build directory")
+    args = parser.parse_args()
+
+    root = Path(args.build_dir)
+    if not (root / "index.html").is_file():
+        print(f"{root} does not look like a React build (no index.html)", file=sys.stderr)
+        sys.exit(1)
+    if brotli is None:
+        print("Brotli package not installed; writing gzip variants only", file=sys.stderr)
+
+    count = 0
+    for path in sorted(root.rglob('*')):
+        if path.is_file() and path.suffix in COMPRESSIBLE_SUFFIXES and path.stat().st_size >= MIN_SIZE:
+            if compress_file(path):
+                count += 1
+    print(f"Precompressed {count} files in {root}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,13 +1,35 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Request, status
+from fastapi.responses import FileResponse, JSONResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
+from starlette.routing import Match
 from motor.motor_asyncio import AsyncIOMotorClient
+import pymongo
+from pymongo import monitoring
+from pymongo.errors import (
+    BulkWriteError, ConnectionFailure, NetworkTimeout, PyMongoError, ServerSelectionTimeoutError
+)
 import os
+import re
+import io
+import json
+import time
+import random
+import asyncio
+import cProfile
+import pstats
+import secrets
+import hashlib
+import hmac
+import mimetypes
+import contextvars
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
-from typing import List, Optional
+from typing import AsyncIterator, List, Optional
 import uuid
 from datetime import datetime, timezone, timedelta
 from jose import JWTError, jwt
@@ -65,9 +87,484 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     payload = verify_token(token)
     return payload
 
+# Admin Configuration (admin endpoints are disabled when ADMIN_TOKEN is unset)
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+
+def is_admin_token(token: Optional[str]) -> bool:
+    # Compare bytes: compare_digest raises TypeError on non-ASCII str input
+    return bool(ADMIN_TOKEN and token and secrets.compare_digest(
+        token.encode('utf-8', 'surrogateescape'), ADMIN_TOKEN.encode('utf-8')
+    ))
+
+# Dependency to guard admin-only endpoints
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not is_admin_token(x_admin_token):
+        raise HTTPException(status_code=403, detail="Admin access required")
+
+
+# Request Profiling Configuration
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0'))  # Fraction of requests to profile (0-1)
+SLOW_REQUEST_MS = float(os.getenv('SLOW_REQUEST_MS', '1000'))  # Latency threshold for slow-request capture
+PROFILE_BUFFER_SIZE = int(os.getenv('PROFILE_BUFFER_SIZE', '50'))  # Traces kept for the admin endpoint
+PROFILE_TOP_FUNCTIONS = 25
+
+# Bounded ring buffer of captured request traces (oldest dropped first)
+profile_traces = deque(maxlen=PROFILE_BUFFER_SIZE)
+
+# Per-request stats; Motor copies the context into its executor threads,
+# so the command listener below can attribute Mongo time to the request.
+class RequestStats:
+    def __init__(self):
+        self.mongo_ms = 0.0
+        self.mongo_ops = 0
+        self.db_failed = False
+
+request_stats = contextvars.ContextVar('request_stats', default=None)
+
+
+class MongoCommandTimer(monitoring.CommandListener):
+    """Accumulate time spent in Mongo commands for the current request"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self._record(event)
+
+    def failed(self, event):
+        self._record(event)
+
+    def _record(self, event):
+        stats = request_stats.get()
+        if stats is not None:
+            stats.mongo_ms += event.duration_micros / 1000
+            stats.mongo_ops += 1
+
+
+def summarize_task_stack(task: asyncio.Task, limit: int = 20) -> List[str]:
+    """Walk the await chain of a task and return one 'file:line in func' entry per frame"""
+    frames = []
+    coro = task.get_coro()
+    while coro is not None and len(frames) < limit:
+        frame = getattr(coro, 'cr_frame', None) or getattr(coro, 'gi_frame', None)
+        if frame is None:
+            break
+        frames.append(f"{Path(frame.f_code.co_filename).name}:{frame.f_lineno} in {frame.f_code.co_name}")
+        coro = getattr(coro, 'cr_await', None) or getattr(coro, 'gi_yieldfrom', None)
+    return frames
+
+
+class RequestProfilerMiddleware:
+    """Opt-in per-request profiling and slow-request capture.
+
+    A request is profiled with cProfile when it carries ``X-Profile: 1`` together
+    with a valid ``X-Admin-Token``, or when it is picked by PROFILE_SAMPLE_RATE.
+    Every request records wall, CPU (event loop thread) and Mongo time; requests
+    slower than SLOW_REQUEST_MS log the await chain they were stuck in. Profiled
+    and slow requests are kept in ``profile_traces`` for GET /api/admin/profiles.
+
+    cProfile and thread CPU time cover the whole event loop thread, so work from
+    concurrent requests can show up in a trace.
+    """
+
+    _profiler_active = False  # Only one cProfile can be enabled per thread
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+        request_id = headers.get('x-request-id', '')[:64] or uuid.uuid4().hex
+        requested = headers.get('x-profile') == '1' and is_admin_token(headers.get('x-admin-token'))
+        sampled = PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+        profiler = None
+        if (requested or sampled) and not RequestProfilerMiddleware._profiler_active:
+            profiler = cProfile.Profile()
+            RequestProfilerMiddleware._profiler_active = True
+
+        # Reuse stats installed by the caller (e.g. traffic_replay.py) so it can read them afterwards
+        stats = request_stats.get() or RequestStats()
+        stats_token = request_stats.set(stats)
+        response_status = None
+
+        async def send_wrapper(message):
+            nonlocal response_status
+            if message['type'] == 'http.response.start':
+                response_status = message['status']
+                message.setdefault('headers', [])
+                message['headers'] = list(message['headers']) + [(b'x-request-id', request_id.encode('latin-1'))]
+            await send(message)
+
+        # Capture where the request is waiting once it crosses the slow threshold
+        stalled_stack = []
+        task = asyncio.current_task()
+        watchdog = asyncio.get_running_loop().call_later(
+            SLOW_REQUEST_MS / 1000, lambda: stalled_stack.extend(summarize_task_stack(task))
+        )
+
+        start_wall = time.perf_counter()
+        start_cpu = time.thread_time()
+        if profiler:
+            profiler.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if profiler:
+                profiler.disable()
+                RequestProfilerMiddleware._profiler_active = False
+            watchdog.cancel()
+            request_stats.reset(stats_token)
+
+            duration_ms = (time.perf_counter() - start_wall) * 1000
+            cpu_ms = (time.thread_time() - start_cpu) * 1000
+            slow = duration_ms >= SLOW_REQUEST_MS
+
+            if profiler or slow:
+                trace = {
+                    "request_id": request_id,
+                    "method": scope.get('method'),
+                    "path": scope.get('path'),
+                    "status": response_status,
+                    "duration_ms": round(duration_ms, 2),
+                    "cpu_ms": round(cpu_ms, 2),
+                    "mongo_ms": round(stats.mongo_ms, 2),
+                    "mongo_ops": stats.mongo_ops,
+                    "slow": slow,
+                    "trigger": "header" if requested else "sample" if sampled else "slow",
+                    "stack": stalled_stack,
+                    "profile": None,
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                }
+                if profiler:
+                    output = io.StringIO()
+                    pstats.Stats(profiler, stream=output).sort_stats('cumulative').print_stats(PROFILE_TOP_FUNCTIONS)
+                    trace["profile"] = output.getvalue()
+                profile_traces.append(trace)
+
+                if slow:
+                    logger.warning(
+                        "Slow request %s %s %s: %.0fms (cpu %.0fms, mongo %.0fms/%d ops) stack=%s",
+                        request_id, scope.get('method'), scope.get('path'), duration_ms,
+                        cpu_ms, stats.mongo_ms, stats.mongo_ops, " <- ".join(reversed(stalled_stack)) or "n/a"
+                    )
+
+
+# Traffic Capture Configuration (disabled unless TRAFFIC_CAPTURE_FILE is set).
+# Capturing costs a JSON encode and a few hashes per /api request on the event
+# loop; file writes are batched and done on a background thread.
+TRAFFIC_CAPTURE_FILE = os.getenv('TRAFFIC_CAPTURE_FILE')
+TRAFFIC_CAPTURE_SALT = os.getenv('TRAFFIC_CAPTURE_SALT') or secrets.token_hex(16)
+TRAFFIC_BODY_LIMIT = 64 * 1024  # Larger bodies are recorded by size only
+
+# String fields kept verbatim because they drive plan calculation; other strings are masked
+TRAFFIC_KEEP_STRING_FIELDS = {"cookingMethod", "ovenType", "unit", "taskType", "sourceOvenType", "user_oven_type"}
+
+TRAFFIC_FLUSH_LINES = 200  # Flush once this many traces are buffered...
+TRAFFIC_FLUSH_SECONDS = 1.0  # ...or this long after the first trace of a batch was buffered
+
+traffic_capture_stream = None
+traffic_capture_buffer = []
+traffic_capture_timer = None  # Pending timed flush, armed when the buffer becomes non-empty
+# A single writer thread keeps chunks in order and the event loop free of file I/O
+traffic_capture_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='traffic-capture')
+
+
+def _write_traffic_chunk(chunk: str):
+    global traffic_capture_stream
+    if traffic_capture_stream is None:
+        traffic_capture_stream = open(TRAFFIC_CAPTURE_FILE, 'a', encoding='utf-8')
+    traffic_capture_stream.write(chunk)
+    traffic_capture_stream.flush()
+
+
+def _close_traffic_stream():
+    global traffic_capture_stream
+    if traffic_capture_stream is not None:
+        traffic_capture_stream.close()
+        traffic_capture_stream = None
+
+
+def _log_traffic_write_error(future):
+    if future.exception() is not None:
+        logger.warning("Traffic capture write failed: %s", future.exception())
+
+
+def flush_traffic_capture(wait: bool = False):
+    """Hand buffered traces to the writer thread as one append"""
+    global traffic_capture_buffer, traffic_capture_timer
+    if traffic_capture_timer is not None:
+        traffic_capture_timer.cancel()
+        traffic_capture_timer = None
+    if not traffic_capture_buffer:
+        return
+    chunk = "".join(traffic_capture_buffer)
+    traffic_capture_buffer = []
+    future = traffic_capture_executor.submit(_write_traffic_chunk, chunk)
+    future.add_done_callback(_log_traffic_write_error)
+    if wait:
+        future.exception()
+
+
+def close_traffic_capture():
+    """Flush remaining traces and close the file; it is reopened on the next trace"""
+    flush_traffic_capture(wait=True)
+    traffic_capture_executor.submit(_close_traffic_stream).result()
+
+
+def hash_identifier(value: str) -> str:
+    """Stable, salted hash used to anonymize user ids and resource ids in captures"""
+    return hmac.new(TRAFFIC_CAPTURE_SALT.encode(), value.encode(), hashlib.sha256).hexdigest()[:16]
+
+
+def anonymize_payload(value, key: Optional[str] = None):
+    """Keep the shape of a JSON payload (keys, lengths, numbers) but mask free-text strings"""
+    if isinstance(value, dict):
+        return {k: anonymize_payload(v, k) for k, v in value.items()}
+    if isinstance(value, list):
+        return [anonymize_payload(v, key) for v in value]
+    if isinstance(value, str) and key not in TRAFFIC_KEEP_STRING_FIELDS:
+        return "x" * len(value)
+    return value
+
+
+def _parse_json_body(body: bytes):
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+class TrafficCaptureMiddleware:
+    """Append one anonymized NDJSON trace per /api request to TRAFFIC_CAPTURE_FILE.
+
+    Each trace holds the route template, a salted user hash, hashed path
+    parameters, the masked JSON payload and the response timing. Ids returned
+    by create endpoints are hashed the same way so traffic_replay.py can map
+    them to the ids created during replay.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not TRAFFIC_CAPTURE_FILE or not scope['path'].startswith('/api/'):
+            await self.app(scope, receive, send)
+            return
+
+        # Wall-clock time so captures from several workers or restarts can be merged
+        timestamp = time.time()
+        request_body = bytearray()
+        request_size = 0
+        response_body = bytearray()
+        response_status = None
+
+        async def receive_wrapper():
+            nonlocal request_size
+            message = await receive()
+            if message['type'] == 'http.request':
+                chunk = message.get('body', b'')
+                request_size += len(chunk)
+                if request_size <= TRAFFIC_BODY_LIMIT:
+                    request_body.extend(chunk)
+            return message
+
+        async def send_wrapper(message):
+            nonlocal response_status
+            if message['type'] == 'http.response.start':
+                response_status = message['status']
+            elif message['type'] == 'http.response.body' and scope['method'] == 'POST':
+                chunk = message.get('body', b'')
+                if len(response_body) + len(chunk) <= TRAFFIC_BODY_LIMIT:
+                    response_body.extend(chunk)
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive_wrapper, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            try:
+                self._record(scope, timestamp, duration_ms, response_status, request_body, request_size, response_body)
+            except Exception as e:
+                logger.warning("Traffic capture failed: %s", e)
+
+    def _record(self, scope, timestamp, duration_ms, response_status, request_body, request_size, response_body):
+        global traffic_capture_timer
+        headers = {k.decode('latin-1').lower(): v.decode('latin-1') for k, v in scope.get('headers', [])}
+
+        user = None
+        authorization = headers.get('authorization', '')
+        if authorization.lower().startswith('bearer '):
+            try:
+                user = hash_identifier(str(verify_token(authorization[7:])['userId']))
+            except Exception:
+                user = None
+
+        query = {}
+        for pair in scope.get('query_string', b'').decode('latin-1').split('&'):
+            if pair:
+                k, _, v = pair.partition('=')
+                query[k] = v if v.lstrip('-').isdigit() else "x" * len(v)
+
+        body = None
+        if request_size <= TRAFFIC_BODY_LIMIT:
+            body = anonymize_payload(_parse_json_body(bytes(request_body)))
+
+        created_id = None
+        response_json = _parse_json_body(bytes(response_body))
+        if isinstance(response_json, dict) and isinstance(response_json.get('id'), str):
+            created_id = hash_identifier(response_json['id'])
+
+        route = scope.get('route')
+        trace = {
+            "ts": round(timestamp, 3),
+            "user": user,
+            "method": scope['method'],
+            "route": getattr(route, 'path', scope['path']),
+            "path_params": {k: hash_identifier(str(v)) for k, v in scope.get('path_params', {}).items()},
+            "query": query,
+            "body": body,
+            "body_bytes": request_size,
+            "status": response_status,
+            "duration_ms": round(duration_ms, 2),
+            "created_id": created_id,
+        }
+
+        traffic_capture_buffer.append(json.dumps(trace) + "\n")
+        if len(traffic_capture_buffer) >= TRAFFIC_FLUSH_LINES:
+            flush_traffic_capture()
+        elif traffic_capture_timer is None:
+            # Flush on a timer so the tail of a burst is written even if no request follows
+            traffic_capture_timer = asyncio.get_running_loop().call_later(TRAFFIC_FLUSH_SECONDS, flush_traffic_capture)
+
+
+# Database Deadline Configuration
+REQUEST_DEADLINE_MS = int(os.getenv('REQUEST_DEADLINE_MS', '5000'))  # Total Mongo budget per request
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', '3000'))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', '3000'))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv('MONGO_SOCKET_TIMEOUT_MS', '10000'))
+CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('CIRCUIT_FAILURE_THRESHOLD', '5'))  # Consecutive failures before opening
+CIRCUIT_RESET_SECONDS = float(os.getenv('CIRCUIT_RESET_SECONDS', '15'))  # How long to fail fast before probing
+
+# Streaming routes can legitimately run longer than one request budget; they
+# apply REQUEST_DEADLINE_MS to each batch operation instead (transfer_batch_deadline)
+DEADLINE_EXEMPT_PATHS = {"/api/export", "/api/import"}
+# Routes that must answer even while Mongo is down
+CIRCUIT_EXEMPT_PATHS = {"/api/"}
+
+
+class DatabaseCircuitBreaker:
+    """Fail fast while Mongo is unhealthy.
+
+    Opens after CIRCUIT_FAILURE_THRESHOLD consecutive connection, server selection
+    or network timeout errors.
+    Once CIRCUIT_RESET_SECONDS have passed a single probe request is let through;
+    its outcome closes the circuit again or keeps it open.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self.probing or time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def allow_request(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half-open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+        self.probing = False
+
+    def retry_after(self) -> int:
+        if self.opened_at is None:
+            return 1
+        return max(1, int(self.reset_seconds - (time.monotonic() - self.opened_at)) + 1)
+
+db_circuit = DatabaseCircuitBreaker(CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS)
+
+
+def database_unavailable_response(error: str, detail: str) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": detail, "error": error},
+        headers={"Retry-After": str(db_circuit.retry_after())}
+    )
+
+
+class DatabaseDeadlineMiddleware:
+    """Give each request a Mongo time budget and short-circuit while Mongo is down.
+
+    pymongo.timeout() stores the deadline in a context variable that Motor
+    carries into its executor threads, so every operation in the request gets
+    the remaining budget as maxTimeMS and as its server selection/socket timeout.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get('path', '')
+        if scope['type'] != 'http' or not path.startswith('/api/') or path.startswith('/api/admin/'):
+            await self.app(scope, receive, send)
+            return
+
+        guarded = path not in CIRCUIT_EXEMPT_PATHS
+        if guarded and not db_circuit.allow_request():
+            response = database_unavailable_response("database_unavailable", "Database temporarily unavailable")
+            await response(scope, receive, send)
+            return
+
+        stats = request_stats.get()
+        try:
+            if path in DEADLINE_EXEMPT_PATHS:
+                await self.app(scope, receive, send)
+            else:
+                with pymongo.timeout(REQUEST_DEADLINE_MS / 1000):
+                    await self.app(scope, receive, send)
+        finally:
+            if guarded and stats is not None and stats.mongo_ops and not stats.db_failed:
+                db_circuit.record_success()
+            elif guarded and db_circuit.probing and (stats is None or not stats.db_failed):
+                # The probe never reached Mongo; let the next request probe instead
+                db_circuit.probing = False
+
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncIOMotorClient(
+    mongo_url,
+    serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+    connectTimeoutMS=MONGO_CONNECT_TIMEOUT_MS,
+    socketTimeoutMS=MONGO_SOCKET_TIMEOUT_MS,
+    event_listeners=[MongoCommandTimer()]
+)
 db = client[os.environ['DB_NAME']]
 
 # Create the main app without a prefix
@@ -77,6 +574,27 @@ app = FastAPI()
 api_router = APIRouter(prefix="/api")
 
 
+@app.exception_handler(PyMongoError)
+async def database_error_handler(request: Request, exc: PyMongoError):
+    """Turn Mongo timeouts and connection failures into a fast, typed 503"""
+    if not (exc.timeout or isinstance(exc, ConnectionFailure)):
+        raise exc
+
+    # Only Mongo health failures trip the circuit; a single query exceeding its
+    # maxTimeMS (ExecutionTimeout) means Mongo answered and says nothing about health
+    if isinstance(exc, (ConnectionFailure, ServerSelectionTimeoutError, NetworkTimeout)):
+        stats = request_stats.get()
+        if stats is not None:
+            stats.db_failed = True
+        db_circuit.record_failure()
+
+    if exc.timeout and not isinstance(exc, ServerSelectionTimeoutError):
+        logger.warning("Database deadline exceeded on %s %s: %s", request.method, request.url.path, exc)
+        return database_unavailable_response("database_timeout", "Database request timed out")
+    logger.warning("Database unavailable on %s %s: %s", request.method, request.url.path, exc)
+    return database_unavailable_response("database_unavailable", "Database temporarily unavailable")
+
+
 # Define Models
 class StatusCheck(BaseModel):
     model_config = ConfigDict(extra="ignore")  # Ignore MongoDB's _id field
@@ -350,6 +868,8 @@ async def google_auth(auth_request: GoogleAuthRequest):
         }
     except ValueError as e:
         raise HTTPException(status_code=401, detail=f"Invalid Google token: {str(e)}")
+    except PyMongoError:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Authentication failed: {str(e)}")
 
@@ -502,7 +1022,7 @@ async def save_dish(dish_data: SavedDishCreate, current_user: dict = Depends(get
     # Check if dish with same name already exists for this user
     existing = await db.saved_dishes.find_one({
         "userId": user_id,
-        "name": {"$regex": f"^{dish_data.name}$", "$options": "i"}  # Case-insensitive match
+        "name": {"$regex": f"^{re.escape(dish_data.name)}$", "$options": "i"}  # Case-insensitive match
     })
     
     if existing:
@@ -751,17 +1271,337 @@ async def calculate_cooking_plan(request: CookingPlanRequest, current_user: dict
         "total_time": total_time
     }
 
+
+# Data Export/Import (NDJSON, one {"collection": ..., "doc": ...} object per line)
+TRANSFER_BATCH_SIZE = int(os.getenv('TRANSFER_BATCH_SIZE', '500'))
+DUPLICATE_KEY_ERROR = 11000
+
+# Collections included in export/import, with the model used to validate imported documents
+TRANSFER_COLLECTIONS = {
+    "saved_dishes": SavedDish,
+    "dishes": Dish,
+    "tasks": Task,
+}
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def transfer_batch_deadline():
+    """Per-batch database budget; export/import routes are exempt from the whole-request one"""
+    return pymongo.timeout(REQUEST_DEADLINE_MS / 1000)
+
+
+async def export_documents(user_id: Optional[str] = None) -> AsyncIterator[str]:
+    """Stream NDJSON lines for one user's data, or for all users when user_id is None.
+
+    Pages through each collection by id so every query gets its own maxTimeMS
+    (a cursor's maxTimeMS is cumulative across all of its batches).
+    """
+    query = {"userId": user_id} if user_id else {}
+    for name in TRANSFER_COLLECTIONS:
+        last_id = None
+        while True:
+            page_query = dict(query, id={"$gt": last_id}) if last_id is not None else query
+            with transfer_batch_deadline():
+                page = await db[name].find(page_query, {"_id": 0}).sort("id", 1).limit(
+                    TRANSFER_BATCH_SIZE
+                ).max_time_ms(REQUEST_DEADLINE_MS).to_list(TRANSFER_BATCH_SIZE)
+            for doc in page:
+                yield json.dumps({"collection": name, "doc": doc}, default=_json_default) + "\n"
+            if len(page) < TRANSFER_BATCH_SIZE:
+                break
+            last_id = page[-1]['id']
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Split a stream of byte chunks into lines without buffering the whole body"""
+    pending = b""
+    async for chunk in chunks:
+        pending += chunk
+        *lines, pending = pending.split(b"\n")
+        for line in lines:
+            yield line
+    if pending:
+        yield pending
+
+
+def derived_import_id(user_id: str, original_id: str) -> str:
+    """Deterministic id for a document imported from another user's export"""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"{user_id}:{original_id}"))
+
+
+async def ensure_indexes():
+    """Unique ids let imports dedupe via duplicate-key errors and make id lookups index scans"""
+    for name in TRANSFER_COLLECTIONS:
+        await db[name].create_index("id", unique=True)
+        await db[name].create_index([("userId", 1), ("id", 1)])  # Paged per-user export
+
+
+async def _insert_batch(name: str, batch: List[dict], counts: dict, user_id: Optional[str] = None):
+    """Insert a batch with insert_many(ordered=False); the unique id index skips existing ids.
+
+    For a single-user import, ids owned by another user (e.g. importing someone
+    else's export) are replaced by an id derived from the user and the original
+    id, so repeat imports hit the same id and are skipped too.
+    """
+    reassigned = set()
+    if user_id:
+        ids = [doc['id'] for doc in batch]
+        with transfer_batch_deadline():
+            owners = {doc['id']: doc.get('userId') async for doc in db[name].find({"id": {"$in": ids}}, {"_id": 0, "id": 1, "userId": 1})}
+        for index, doc in enumerate(batch):
+            if doc['id'] in owners and owners[doc['id']] != user_id:
+                doc['id'] = derived_import_id(user_id, doc['id'])
+                reassigned.add(index)
+
+    duplicates = set()
+    try:
+        with transfer_batch_deadline():
+            await db[name].insert_many(batch, ordered=False)
+    except BulkWriteError as e:
+        # With ordered=False the rest of the batch is still written
+        errors = e.details.get('writeErrors', [])
+        if any(error.get('code') != DUPLICATE_KEY_ERROR for error in errors):
+            raise
+        duplicates = {error['index'] for error in errors}
+
+    counts[name]["inserted"] += len(batch) - len(duplicates)
+    counts[name]["skipped"] += len(duplicates)
+    counts[name]["reassigned"] += len(reassigned - duplicates)
+
+
+async def import_documents(lines: AsyncIterator, user_id: Optional[str] = None) -> dict:
+    """Import NDJSON lines in batches, deduplicating by id.
+
+    When user_id is given every document is assigned to that user; otherwise
+    each document keeps its own userId (admin restore of all users).
+    """
+    counts = {name: {"inserted": 0, "skipped": 0, "reassigned": 0} for name in TRANSFER_COLLECTIONS}
+    invalid = 0
+    batches = {name: [] for name in TRANSFER_COLLECTIONS}
+
+    async for line in lines:
+        if not line.strip():
+            continue
+        try:
+            # Lines may be raw bytes from a request body; bad UTF-8 counts as invalid
+            if isinstance(line, bytes):
+                line = line.decode('utf-8')
+            record = json.loads(line)
+            name = record['collection']
+            model = TRANSFER_COLLECTIONS[name]
+            doc = dict(record['doc'])
+            if user_id:
+                doc['userId'] = user_id
+            doc = model(**doc).model_dump()
+        except (ValueError, KeyError, TypeError):
+            invalid += 1
+            continue
+
+        # Stored documents use ISO strings for datetimes, matching the CRUD endpoints
+        for key, value in doc.items():
+            if isinstance(value, datetime):
+                doc[key] = value.isoformat()
+
+        batches[name].append(doc)
+
+        if len(batches[name]) >= TRANSFER_BATCH_SIZE:
+            await _insert_batch(name, batches[name], counts, user_id)
+            batches[name] = []
+
+    for name, batch in batches.items():
+        if batch:
+            await _insert_batch(name, batch, counts, user_id)
+
+    return {"collections": counts, "invalid": invalid}
+
+
+@api_router.get("/export")
+async def export_user_data(current_user: dict = Depends(get_current_user)):
+    """Stream the authenticated user's saved dishes, dishes and tasks as NDJSON"""
+    return StreamingResponse(
+        export_documents(current_user['userId']),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="cooking-sync-export.ndjson"'}
+    )
+
+@api_router.post("/import")
+async def import_user_data(request: Request, current_user: dict = Depends(get_current_user)):
+    """Import an NDJSON export into the authenticated user's account.
+
+    Documents the user already has are skipped; ids owned by other users get a
+    new id derived from the original, so importing the same export twice is a no-op.
+    """
+    return await import_documents(iter_lines(request.stream()), current_user['userId'])
+
+
+# Admin Endpoints
+@api_router.get("/admin/profiles", dependencies=[Depends(require_admin)])
+async def list_profiles():
+    """List captured request traces (newest first) without the full profile text"""
+    return [
+        {k: v for k, v in trace.items() if k != "profile"}
+        for trace in reversed(profile_traces)
+    ]
+
+@api_router.get("/admin/profiles/{request_id}", dependencies=[Depends(require_admin)])
+async def get_profile(request_id: str):
+    """Get a captured request trace including its cProfile summary"""
+    for trace in reversed(profile_traces):
+        if trace["request_id"] == request_id:
+            return trace
+    raise HTTPException(status_code=404, detail="Profile not found")
+
 # Include the router in the main app
 app.include_router(api_router)
 
+# Inside CORS so that fail-fast 503s still carry CORS headers
+app.add_middleware(DatabaseDeadlineMiddleware)
+
+
+# Static PWA Configuration (disabled unless STATIC_DIR points at a React build)
+STATIC_DIR = os.getenv('STATIC_DIR')
+
+# Content-hashed build output (e.g. main.1a2b3c4d.js) never changes, so it can be cached forever
+HASHED_ASSET_PATTERN = re.compile(r'\.[0-9a-f]{8,}\.')
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Entry points must be revalidated so new deploys are picked up
+REVALIDATE_FILES = {"index.html", "manifest.json", "service-worker.js"}
+REVALIDATE_CACHE_CONTROL = "no-cache"
+DEFAULT_CACHE_CONTROL = "public, max-age=3600"
+
+# Precompressed variants written by precompress_assets.py, in order of preference
+PRECOMPRESSED_ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+
+ALL_METHODS = ["GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"]
+
+
+class StaticAsset:
+    """A file from the build directory with its precompressed variants"""
+
+    def __init__(self, path: Path, relative_path: str):
+        self.path = path
+        self.media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        self.etag = self._etag(path)
+        self.variants = {}  # encoding -> (path, etag)
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            variant = path.with_name(path.name + suffix)
+            if variant.is_file():
+                self.variants[encoding] = (variant, self._etag(variant))
+
+        if relative_path in REVALIDATE_FILES:
+            self.cache_control = REVALIDATE_CACHE_CONTROL
+        elif HASHED_ASSET_PATTERN.search(path.name):
+            self.cache_control = IMMUTABLE_CACHE_CONTROL
+        else:
+            self.cache_control = DEFAULT_CACHE_CONTROL
+
+    @staticmethod
+    def _etag(path: Path) -> str:
+        stat_result = path.stat()
+        return '"' + hashlib.md5(f"{stat_result.st_mtime_ns}-{stat_result.st_size}".encode()).hexdigest() + '"'
+
+
+def build_static_index(static_dir: str) -> dict:
+    """Index the build directory once at startup; only indexed files are ever served"""
+    root = Path(static_dir)
+    suffixes = tuple(suffix for _, suffix in PRECOMPRESSED_ENCODINGS)
+    index = {}
+    for path in root.rglob('*'):
+        if path.is_file() and not path.name.endswith(suffixes):
+            relative_path = path.relative_to(root).as_posix()
+            index[relative_path] = StaticAsset(path, relative_path)
+    return index
+
+
+def accepted_encodings(accept_encoding: str) -> set:
+    encodings = set()
+    for part in accept_encoding.split(','):
+        name, _, params = part.partition(';')
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue  # Explicitly refused
+            except ValueError:
+                continue
+        encodings.add(name.strip().lower())
+    return encodings
+
+
+def static_asset_response(asset: StaticAsset, request: Request) -> Response:
+    """Serve an asset, preferring a precompressed variant the client accepts"""
+    path, etag, encoding = asset.path, asset.etag, None
+    if asset.variants:
+        accepted = accepted_encodings(request.headers.get('accept-encoding', ''))
+        for candidate, _ in PRECOMPRESSED_ENCODINGS:
+            if candidate in accepted and candidate in asset.variants:
+                path, etag = asset.variants[candidate]
+                encoding = candidate
+                break
+
+    headers = {"Cache-Control": asset.cache_control, "ETag": etag}
+    if asset.variants:
+        headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        headers["Content-Encoding"] = encoding
+
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+        return Response(status_code=304, headers=headers)
+
+    # FileResponse only sends zero-copy on servers implementing http.response.pathsend;
+    # uvicorn (used by our images) does not, so files are streamed in chunks there
+    return FileResponse(path, media_type=asset.media_type, headers=headers)
+
+
+if STATIC_DIR:
+    static_assets = build_static_index(STATIC_DIR)
+    if "index.html" not in static_assets:
+        raise RuntimeError(f"STATIC_DIR {STATIC_DIR} does not contain index.html")
+
+    api_routes = list(app.router.routes)
+
+    # Registered after the API router so /api routes always match first; keeps
+    # unknown /api paths a 404 for every method instead of the catch-all's 405
+    @app.api_route("/api", methods=ALL_METHODS, include_in_schema=False)
+    @app.api_route("/api/{rest:path}", methods=ALL_METHODS, include_in_schema=False)
+    async def api_not_found(request: Request):
+        allowed = set()
+        for route in api_routes:
+            if route.matches(request.scope)[0] == Match.PARTIAL:
+                allowed.update(route.methods or ())
+        if allowed:
+            raise HTTPException(status_code=405, detail="Method Not Allowed", headers={"Allow": ", ".join(sorted(allowed))})
+        raise HTTPException(status_code=404, detail="Not Found")
+
+    @app.api_route("/{full_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+    async def serve_pwa(full_path: str, request: Request):
+        """Serve the React build, falling back to index.html for client-side routes"""
+        asset = static_assets.get(full_path or "index.html")
+        if asset is None:
+            if "." in full_path.rsplit('/', 1)[-1]:
+                raise HTTPException(status_code=404, detail="Not Found")
+            asset = static_assets["index.html"]
+        return static_asset_response(asset, request)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+# Added last so they wrap everything, including CORS handling (profiler outermost)
+app.add_middleware(TrafficCaptureMiddleware)
+app.add_middleware(RequestProfilerMiddleware)
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -769,6 +1609,15 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def create_indexes():
+    try:
+        await ensure_indexes()
+    except Exception as e:
+        # Keep serving the API; only import dedupe depends on the unique index
+        logger.error("Could not create indexes, import dedupe is not enforced: %s", e)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    client.close()
+    close_traffic_capture()
\ No newline at end of file
@@ -0,0 +1,223 @@
+"""Replay captured traffic against the FastAPI app for capacity planning.
+
+Reads a file written by TrafficCaptureMiddleware (TRAFFIC_CAPTURE_FILE) and
+drives the in-process `app` directly over ASGI, against a throwaway local
+Mongo database. Each captured user is replayed as its own sequential stream,
+so per-user ordering is preserved while users run concurrently.
+
+    docker run -d -p 27017:27017 mongo:4.4
+    python traffic_replay.py capture.ndjson --speed 10
+    python traffic_replay.py capture.ndjson --speed 100 --mongo-url mongodb://localhost:27017 --json
+
+The replay database (default: cooking_sync_replay) is dropped before each run.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import sys
+import time
+from collections import defaultdict
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p * len(ordered)) - 1)]
+
+
+async def call_app(app, method, path, query_string, headers, body):
+    """Send one request through the ASGI app and return (status, response body)"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query_string.encode(),
+        "root_path": "",
+        "headers": [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers.items()],
+        "client": ("127.0.0.1", 0),
+        "server": ("replay", 80),
+    }
+    body_sent = False
+    disconnected = asyncio.get_running_loop().create_future()
+    status = None
+    chunks = []
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnected  # Never disconnect mid-response
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    await app(scope, receive, send)
+    return status, b"".join(chunks)
+
+
+class Replayer:
+    def __init__(self, server, traces, speed):
+        self.server = server
+        self.traces = traces
+        self.speed = speed
+        self.id_map = {}  # Captured id hash -> id created during replay
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(lambda: defaultdict(int))
+        self.mongo_ops = defaultdict(int)
+
+    def build_request(self, trace, user):
+        path = trace['route']
+        for name, hashed in trace.get('path_params', {}).items():
+            path = path.replace("{" + name + "}", self.id_map.get(hashed, hashed))
+        query_string = "&".join(f"{k}={v}" for k, v in trace.get('query', {}).items())
+
+        headers = {}
+        if user:
+            token = self.server.create_access_token({
+                "userId": f"replay-{user}",
+                "email": f"{user}@replay.invalid",
+                "name": "Replay User"
+            })
+            headers['authorization'] = f"Bearer {token}"
+        body = b""
+        if trace.get('body') is not None:
+            body = json.dumps(trace['body']).encode()
+            headers['content-type'] = 'application/json'
+        headers['content-length'] = str(len(body))
+        return path, query_string, headers, body
+
+    async def run_stream(self, user, stream, replay_start, first_ts):
+        loop = asyncio.get_running_loop()
+        for trace in stream:
+            delay = (trace['ts'] - first_ts) / self.speed - (loop.time() - replay_start)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            path, query_string, headers, body = self.build_request(trace, user)
+            route_key = f"{trace['method']} {trace['route']}"
+            stats = self.server.RequestStats()
+            token = self.server.request_stats.set(stats)
+            start = time.perf_counter()
+            try:
+                status, response = await call_app(self.server.app, trace['method'], path, query_string, headers, body)
+            except Exception:
+                status, response = None, b""
+            finally:
+                self.server.request_stats.reset(token)
+            self.latencies[route_key].append((time.perf_counter() - start) * 1000)
+            self.statuses[route_key][status or "error"] += 1
+            self.mongo_ops[route_key] += stats.mongo_ops
+
+            if trace.get('created_id') and status and status < 300:
+                try:
+                    self.id_map[trace['created_id']] = json.loads(response)['id']
+                except (ValueError, KeyError, TypeError):
+                    pass
+
+    async def run(self):
+        streams = defaultdict(list)
+        for index, trace in enumerate(self.traces):
+            # Anonymous requests have no ordering to preserve, so each gets its own stream
+            streams[trace.get('user') or f"anonymous-{index}"].append(trace)
+        # Offsets are taken from the earliest capture across all workers and restarts
+        first_ts = min(trace['ts'] for trace in self.traces)
+
+        loop = asyncio.get_running_loop()
+        replay_start = loop.time()
+        await asyncio.gather(*(
+            self.run_stream(None if key.startswith("anonymous-") else key, sorted(stream, key=lambda t: t['ts']), replay_start, first_ts)
+            for key, stream in streams.items()
+        ))
+        return loop.time() - replay_start
+
+    def report(self, elapsed):
+        routes = {}
+        for route_key, latencies in sorted(self.latencies.items()):
+            routes[route_key] = {
+                "requests": len(latencies),
+                "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+                "p50_ms": round(percentile(latencies, 0.50), 2),
+                "p95_ms": round(percentile(latencies, 0.95), 2),
+                "p99_ms": round(percentile(latencies, 0.99), 2),
+                "max_ms": round(max(latencies), 2),
+                "mongo_ops": self.mongo_ops[route_key],
+                "statuses": {str(k): v for k, v in self.statuses[route_key].items()},
+            }
+        total = sum(len(latencies) for latencies in self.latencies.values())
+        return {
+            "speed": self.speed,
+            "requests": total,
+            "elapsed_s": round(elapsed, 2),
+            "throughput_rps": round(total / elapsed, 2) if elapsed else None,
+            "routes": routes,
+        }
+
+
+def print_report(report):
+    print(f"Replayed {report['requests']} requests at {report['speed']}x in {report['elapsed_s']}s "
+          f"({report['throughput_rps']} req/s)")
+    print(f"{'route':<45} {'reqs':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'mongo':>7}  statuses")
+    for route_key, r in report['routes'].items():
+        statuses = " ".join(f"{k}:{v}" for k, v in r['statuses'].items())
+        print(f"{route_key:<45} {r['requests']:>6} {r['throughput_rps']:>8} {r['p50_ms']:>8} {r['p95_ms']:>8} "
+              f"{r['p99_ms']:>8} {r['max_ms']:>8} {r['mongo_ops']:>7}  {statuses}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay captured Smart Cooking Sync traffic against a local Mongo")
+    parser.add_argument('capture', help="NDJSON file written by TRAFFIC_CAPTURE_FILE")
+    parser.add_argument('--speed', type=float, default=1.0, help="Replay speed multiplier, e.g. 1, 10, 100")
+    parser.add_argument('--mongo-url', default='mongodb://localhost:27017', help="Local Mongo to replay against")
+    parser.add_argument('--db-name', default='cooking_sync_replay', help="Scratch database, dropped before the run")
+    parser.add_argument('--json', action='store_true', help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if 'replay' not in args.db_name:
+        parser.error("--db-name must contain 'replay'; the database is dropped before each run")
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+
+    # Configure before importing the app; explicit values win over backend/.env
+    os.environ['MONGO_URL'] = args.mongo_url
+    os.environ['DB_NAME'] = args.db_name
+    os.environ['TRAFFIC_CAPTURE_FILE'] = ''
+    import server
+
+    with open(args.capture, encoding='utf-8') as f:
+        traces = [json.loads(line) for line in f if line.strip()]
+    if not traces:
+        print("No traces found", file=sys.stderr)
+        sys.exit(1)
+
+    async def run():
+        await server.client.drop_database(args.db_name)
+        replayer = Replayer(server, traces, args.speed)
+        elapsed = await replayer.run()
+        return replayer.report(elapsed)
+
+    try:
+        report = asyncio.run(run())
+    finally:
+        server.client.close()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == '__main__':
+    main()